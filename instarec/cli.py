@@ -1,55 +1,117 @@
 import argparse
 import asyncio
 import logging
+import re
 import sys
+import threading
+from functools import lru_cache
 from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
-
-from tqdm import tqdm
+from typing import TYPE_CHECKING
 
 if __name__ == "__main__" and __package__ is None:
     project_root = Path(__file__).resolve().parents[1]
     sys.path.insert(0, str(project_root))
     from instarec import cli  # noqa: PLW0406
 
-    sys.exit(cli.main_entry())
+    sys.exit(cli.run_cli())
+
+from . import log
+
+if TYPE_CHECKING:
+    import aiohttp
+
+try:
+    APP_VERSION = version("instarec")
+except PackageNotFoundError:
+    APP_VERSION = "unknown"
 
-from . import instagram, log
-from .downloader import StreamDownloader
-from .interactive import interactive_stream_selection
+MPD_URL_PATTERN = re.compile(r"live-dash.*\.mpd", re.IGNORECASE)
+LOG_FORMATTER = logging.Formatter("%(asctime)s - %(levelname)s - [%(task_name)s] - %(message)s")
 
 
 class TqdmStreamHandler(logging.StreamHandler):
+    flush_interval = 0.1
+    max_buffered_records = 100
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self._buffer: list[str] = []
+        self._flush_timer: threading.Timer | None = None
+
     def emit(self, record):
         try:
-            msg = self.format(record)
-            tqdm.write(msg, file=self.stream)
-            self.flush()
+            self._buffer.append(self.format(record))
+            if record.levelno >= logging.WARNING or len(self._buffer) >= self.max_buffered_records:
+                self._write_buffer()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
         except (KeyboardInterrupt, SystemExit):
             raise
         except Exception:
             self.handleError(record)
 
+    def _write_buffer(self):
+        from tqdm import tqdm  # noqa: PLC0415
+
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._buffer:
+            tqdm.write("\n".join(self._buffer), file=self.stream)
+            self._buffer.clear()
+        super().flush()
+
+    def flush(self):
+        with self.lock:
+            self._write_buffer()
+
 
 class TaskNameFilter(logging.Filter):
     def filter(self, record):
-        if not hasattr(record, "task_name"):
-            record.task_name = "SYSTEM"
+        record.__dict__.setdefault("task_name", "SYSTEM")
         return True
 
 
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def _non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be zero or a positive integer, got {value}")
+    return number
+
+
+def _positive_float(value: str) -> float:
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive number, got {value}")
+    return number
+
+
+def _non_negative_float(value: str) -> float:
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be zero or a positive number, got {value}")
+    return number
+
+
+@lru_cache(maxsize=1)
 def get_argument_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
+        prog="instarec",
         description="Download Instagram live streams.",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
 
-    try:
-        app_version = version("instarec")
-    except PackageNotFoundError:
-        app_version = "unknown"
-
-    parser.add_argument("--version", action="version", version=f"%(prog)s {app_version}")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {APP_VERSION}")
 
     parser.add_argument(
         "url_or_username",
@@ -105,27 +167,36 @@ def get_argument_parser() -> argparse.ArgumentParser:
     net_group = parser.add_argument_group("Network Settings")
     net_group.add_argument(
         "--poll-interval",
-        type=float,
+        type=_positive_float,
         default=2.0,
         help="Seconds to wait between polling the manifest for live segments.",
     )
     net_group.add_argument(
         "--max-search-requests",
-        type=int,
+        type=_positive_int,
         default=50,
         help="Maximum number of concurrent requests when searching for past segments.",
     )
     net_group.add_argument(
-        "--download-retries", type=int, default=5, help="Number of retries for a failed segment download."
+        "--download-retries", type=_positive_int, default=5, help="Number of retries for a failed segment download."
     )
     net_group.add_argument(
         "--download-retry-delay",
-        type=float,
+        type=_non_negative_float,
         default=1.0,
         help="Initial delay in seconds between download retries (exponential backoff).",
     )
     net_group.add_argument(
-        "--check-url-retries", type=int, default=3, help="Number of retries for a failed URL check (HEAD request)."
+        "--check-url-retries",
+        type=_positive_int,
+        default=3,
+        help="Number of retries for a failed URL check (HEAD request).",
+    )
+    net_group.add_argument(
+        "--connection-pool-size",
+        type=_non_negative_int,
+        default=256,
+        help="Maximum number of simultaneous connections kept in the HTTP connection pool (0 for no limit).",
     )
     net_group.add_argument(
         "--proxy",
@@ -140,25 +211,25 @@ def get_argument_parser() -> argparse.ArgumentParser:
     )
     stream_group.add_argument(
         "--end-stream-miss-threshold",
-        type=int,
+        type=_positive_int,
         default=30000,
         help="Number of consecutive timestamps to search for a segment before assuming the past stream has ended.",
     )
     stream_group.add_argument(
         "--search-chunk-size",
-        type=int,
+        type=_positive_int,
         default=500,
         help="Number of segments to check for existence in a single batch when searching.",
     )
     stream_group.add_argument(
         "--live-end-timeout",
-        type=float,
+        type=_positive_float,
         default=180.0,
         help="Seconds to wait without a new live segment before assuming the stream has ended.",
     )
     stream_group.add_argument(
         "--past-segment-delay",
-        type=float,
+        type=_non_negative_float,
         default=0.1,
         help="Minimum time in seconds between the start of each past segment download.",
     )
@@ -167,6 +238,11 @@ def get_argument_parser() -> argparse.ArgumentParser:
     output_group.add_argument(
         "--keep-segments", action="store_true", help="Do not delete the temporary segments directory after finishing."
     )
+    output_group.add_argument(
+        "--faststart",
+        action="store_true",
+        help="Move the moov atom to the front of .mp4 output for web playback. Costs an extra pass over the file.",
+    )
     output_group.add_argument("--ffmpeg-path", default="ffmpeg", help="Path to the ffmpeg executable.")
     output_group.add_argument("--ffprobe-path", default="ffprobe", help="Path to the ffprobe executable.")
 
@@ -186,18 +262,22 @@ def configure_logging(args: argparse.Namespace):
 
     task_filter = TaskNameFilter()
     for handler in log_handlers:
+        handler.setFormatter(LOG_FORMATTER)
         handler.addFilter(task_filter)
 
-    logging.basicConfig(
-        level=log_level, format="%(asctime)s - %(levelname)s - [%(task_name)s] - %(message)s", handlers=log_handlers
-    )
+    root_logger = logging.getLogger()
+    root_logger.setLevel(log_level)
+    root_logger.handlers[:] = log_handlers
+
 
-    if not args.verbose:
-        logging.getLogger("instagrapi").setLevel(logging.WARNING)
-        logging.getLogger("private_request").setLevel(logging.WARNING)
+def quiet_instagrapi_loggers():
+    logging.getLogger("instagrapi").setLevel(logging.WARNING)
+    logging.getLogger("private_request").setLevel(logging.WARNING)
 
 
-async def main(args: argparse.Namespace) -> None:
+async def main(args: argparse.Namespace, session: "aiohttp.ClientSession | None" = None) -> None:
+    from .downloader import StreamDownloader  # noqa: PLC0415
+
     downloader = StreamDownloader(
         mpd_url=args.url_or_username,
         output_path_str=args.output_path,
@@ -209,74 +289,122 @@ async def main(args: argparse.Namespace) -> None:
         download_retry_delay=args.download_retry_delay,
         check_url_retries=args.check_url_retries,
         proxy=args.proxy,
+        connection_pool_size=args.connection_pool_size,
         end_stream_miss_threshold=args.end_stream_miss_threshold,
         search_chunk_size=args.search_chunk_size,
         live_end_timeout=args.live_end_timeout,
         no_past=args.no_past,
         past_segment_delay=args.past_segment_delay,
         keep_segments=args.keep_segments,
+        faststart=args.faststart,
         ffmpeg_path=args.ffmpeg_path,
         ffprobe_path=args.ffprobe_path,
         preferred_video_ids=args.video_quality,
         preferred_audio_ids=args.audio_quality,
+        session=session,
     )
     await downloader.run()
 
 
 async def resolve_mpd_url(identifier: str, cookie_file: str | None, proxy: str | None) -> str:
+    from . import instagram  # noqa: PLC0415
+
     async with instagram.get_client(cookie_file=cookie_file, proxy=proxy) as client:
         return await client.get_mpd(identifier)
 
 
-def main_entry():
-    parser = get_argument_parser()
-    args = parser.parse_args()
+def install_event_loop_policy():
+    if sys.platform == "win32":
+        return
+    try:
+        import uvloop  # noqa: PLC0415
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    log.MAIN.debug("Using uvloop event loop.")
 
-    configure_logging(args)
 
-    if not Path(args.output_path).suffix:
-        args.output_path += ".mkv"
-        log.MAIN.info(f"No output file extension provided. Defaulting to: {args.output_path}")
+def has_file_extension(path: str) -> bool:
+    name_start = max(path.rfind("/"), path.rfind("\\")) + 1
+    dot = path.rfind(".")
+    return name_start < dot < len(path) - 1
+
 
-    input_value: str = args.url_or_username
-    mpd_url = ""
+async def run(args: argparse.Namespace) -> int:
+    mpd_url: str = args.url_or_username
+    proxy: str | None = args.proxy
+
+    if not MPD_URL_PATTERN.search(mpd_url):
+        from . import instagram  # noqa: PLC0415
+
+        if not args.verbose:
+            quiet_instagrapi_loggers()
 
-    if "live-dash" in input_value.lower() and ".mpd" in input_value.lower():
-        mpd_url = input_value
-    else:
         try:
-            mpd_url = asyncio.run(resolve_mpd_url(input_value, args.cookies, args.proxy))
+            mpd_url = await resolve_mpd_url(mpd_url, args.cookies, proxy)
         except (instagram.UserNotLiveError, instagram.UserNotFoundError) as e:
             log.MAIN.error(f"Not Found error: {e}")
-            sys.exit(1)
+            return 1
         except instagram.AuthError as e:
             log.MAIN.error(f"Authentication error: {e}")
-            sys.exit(1)
+            return 1
         except ImportError as e:
             log.MAIN.error(str(e))
-            sys.exit(1)
+            return 1
         except Exception as e:
             log.MAIN.error(f"Unexpected error: {e}")
-            sys.exit(1)
+            return 1
 
-    if args.interactive:
-        try:
-            selections = asyncio.run(interactive_stream_selection(mpd_url))
-            args.video_quality = [selections["video_id"]]
-            if selections["audio_id"]:
-                args.audio_quality = [selections["audio_id"]]
-        except (KeyboardInterrupt, asyncio.CancelledError):
-            log.MAIN.warning("Stream selection cancelled by user.")
-            sys.exit(0)
-        except Exception as e:
-            log.MAIN.error(f"Failed to fetch streams for interactive selection: {e}")
-            sys.exit(1)
+    from .io import create_session  # noqa: PLC0415
+
+    if proxy:
+        log.MAIN.debug(f"aiohttp proxy set: {proxy}")
+
+    async with create_session(proxy, args.connection_pool_size) as session:
+        if args.interactive:
+            from .interactive import interactive_stream_selection  # noqa: PLC0415
 
-    args.url_or_username = mpd_url
+            try:
+                selections = await interactive_stream_selection(mpd_url, session)
+                args.video_quality = [selections["video_id"]]
+                if selections["audio_id"]:
+                    args.audio_quality = [selections["audio_id"]]
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                log.MAIN.warning("Stream selection cancelled by user.")
+                return 0
+            except Exception as e:
+                log.MAIN.error(f"Failed to fetch streams for interactive selection: {e}")
+                return 1
+
+        args.url_or_username = mpd_url
+        await main(args, session)
+    return 0
+
+
+def run_cli(argv: list[str] | None = None, interactive: bool = False) -> int | None:
+    parser = get_argument_parser()
+    args = parser.parse_args(argv)
+    args.interactive = args.interactive or interactive
+
+    configure_logging(args)
+    install_event_loop_policy()
+
+    output_path: str = args.output_path
+    if not has_file_extension(output_path):
+        args.output_path = output_path = output_path + ".mkv"
+        log.MAIN.info(f"No output file extension provided. Defaulting to: {output_path}")
 
     try:
-        asyncio.run(main(args))
+        return asyncio.run(run(args))
     except (KeyboardInterrupt, asyncio.CancelledError):
         log.MAIN.warning("Download interrupted by user.")
     except Exception as e:
-        log.MAIN.error(f"A critical error occurred: {e}", exc_info=True)
+        log.MAIN.error(f"A critical error occurred: {e}", exc_info=args.verbose)
+
+
+def main_entry():
+    return run_cli()
+
+
+def interactive_entry():
+    return run_cli(interactive=True)
@@ -1,13 +1,78 @@
+import asyncio
+import json
+import time
 from abc import ABC, abstractmethod
 from typing import Any
 
+from platformdirs import user_config_path
+
 from .. import log
 from .exceptions import UserNotFoundError, UserNotLiveError
 
+CONFIG_DIR = user_config_path("instarec", "instarec")
+USER_ID_CACHE_PATH = CONFIG_DIR / "user_ids.json"
+USER_ID_CACHE_TTL = 24 * 60 * 60
+MAX_CONCURRENT_LOOKUPS = 8
+API_RATE_LIMIT_REQUESTS = 200
+API_RATE_LIMIT_WINDOW = 300.0
+
+
+def _load_user_id_cache() -> dict[str, Any]:
+    try:
+        cache = json.loads(USER_ID_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_user_id_cache(cache: dict[str, Any]):
+    try:
+        USER_ID_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        USER_ID_CACHE_PATH.write_text(json.dumps(cache, indent=2, sort_keys=True), encoding="utf-8")
+    except OSError as e:
+        log.API.warning(f"Could not save user ID cache to {USER_ID_CACHE_PATH}: {e}")
+
+
+def _cached_user_id(entry: Any) -> str | None:
+    if not isinstance(entry, dict):
+        return None
+    user_id, resolved_at = entry.get("user_id"), entry.get("resolved_at")
+    if not isinstance(user_id, str) or not isinstance(resolved_at, (int, float)):
+        return None
+    # Usernames can be released and claimed by someone else, so a mapping is only trusted for a limited time.
+    if time.time() - resolved_at >= USER_ID_CACHE_TTL:
+        return None
+    return user_id
+
+
+class RateLimiter:
+    def __init__(self, max_requests: int, window: float):
+        self.max_requests = max_requests
+        self.window = window
+        self._window_start: float | None = None
+        self._count = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._window_start is None or now - self._window_start >= self.window:
+                self._window_start, self._count = now, 0
+            if self._count >= self.max_requests:
+                wait_time = self._window_start + self.window - now
+                log.API.warning(f"API request budget exhausted, waiting {wait_time:.0f}s before the next request...")
+                await asyncio.sleep(wait_time)
+                self._window_start, self._count = loop.time(), 0
+            self._count += 1
+
 
 class InstagramClient(ABC):
     def __init__(self, proxy: str | None = None):
         self.proxy = proxy
+        self.user_id_cache = _load_user_id_cache()
+        self._user_id_cache_lock = asyncio.Lock()
+        self.rate_limiter = RateLimiter(API_RATE_LIMIT_REQUESTS, API_RATE_LIMIT_WINDOW)
 
     async def __aenter__(self):
         return self
@@ -27,12 +92,28 @@ class InstagramClient(ABC):
     async def fetch_story_feed_info(self, user_id: str) -> dict[str, Any]:
         pass
 
+    async def resolve_user_id(self, username: str) -> str:
+        key = username.lower()
+        if user_id := _cached_user_id(self.user_id_cache.get(key)):
+            log.API.debug(f"Using cached user ID {user_id} for username: '{username}'")
+            return user_id
+
+        log.API.debug(f"Resolving user ID for username: '{username}'")
+        user_id = str(await self.fetch_user_id(username))
+        self.user_id_cache[key] = {"user_id": user_id, "resolved_at": time.time()}
+        await self._save_user_id_cache()
+        return user_id
+
+    async def forget_user_id(self, username: str):
+        if self.user_id_cache.pop(username.lower(), None) is not None:
+            await self._save_user_id_cache()
+
+    async def _save_user_id_cache(self):
+        async with self._user_id_cache_lock:
+            await asyncio.to_thread(_save_user_id_cache, dict(self.user_id_cache))
+
     async def get_mpd(self, identifier: str) -> str:
-        if not identifier.isdigit():
-            log.API.debug(f"Resolving user ID for username: '{identifier}'")
-            user_id = await self.fetch_user_id(identifier)
-        else:
-            user_id = identifier
+        user_id = identifier if identifier.isdigit() else await self.resolve_user_id(identifier)
 
         log.API.info(f"Checking live status for {user_id}...")
         try:
@@ -44,7 +125,12 @@ class InstagramClient(ABC):
             log.API.info("User doesn't seem to be live")
 
         log.API.info("Checking their story feed in case they are a co-host...")
-        story_feed_info = await self.fetch_story_feed_info(user_id)
+        try:
+            story_feed_info = await self.fetch_story_feed_info(user_id)
+        except UserNotFoundError:
+            if not identifier.isdigit():
+                await self.forget_user_id(identifier)
+            raise
         if (broadcast := story_feed_info.get("broadcast")) and (mpd_url := broadcast.get("dash_abr_playback_url")):
             host = broadcast.get("broadcast_owner", {})
             host_username = host.get("username", user_id)
@@ -52,3 +138,17 @@ class InstagramClient(ABC):
             return mpd_url
 
         raise UserNotLiveError(f"{identifier} is not currently live.")
+
+    async def get_mpds(self, identifiers: list[str]) -> dict[str, str | None]:
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+
+        async def get_mpd_or_none(identifier: str) -> str | None:
+            async with semaphore:
+                try:
+                    return await self.get_mpd(identifier)
+                except (UserNotLiveError, UserNotFoundError) as e:
+                    log.API.info(str(e))
+                    return None
+
+        mpd_urls = await asyncio.gather(*(get_mpd_or_none(identifier) for identifier in identifiers))
+        return dict(zip(identifiers, mpd_urls, strict=True))
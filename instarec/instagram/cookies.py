@@ -1,11 +1,14 @@
+import asyncio
+import json
+import random
 from http.cookiejar import MozillaCookieJar
 from pathlib import Path
 from typing import Any
+from urllib.parse import quote
 
 import aiohttp
-from aiohttp_socks import ProxyConnector
 
-from .. import log
+from .. import io, log
 from .client import InstagramClient
 from .exceptions import AuthError, InstagramError, UserNotFoundError
 
@@ -16,12 +19,28 @@ BASE_HEADERS = {
         "Chrome/120.0.0.0 Safari/537.36"
     ),
     "x-ig-app-id": "936619743392459",
+    "Accept-Encoding": "gzip, deflate",
 }
 
 USER_API_URL = "https://www.instagram.com/web/search/topsearch/?query={username}"
 LIVE_API_URL = "https://www.instagram.com/api/v1/live/web_info/?target_user_id={user_id}"
 STORY_FEED_API_URL = "https://www.instagram.com/api/v1/feed/user/{user_id}/story/"
 
+CONNECTION_POOL_SIZE = 32
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 2.0
+MAX_RETRY_DELAY = 30.0
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _retry_delay(attempt: int, retry_after: str | None) -> float:
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(MAX_RETRY_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)) * random.uniform(1.0, 1.5)
+
 
 class CookieClient(InstagramClient):
     def __init__(self, cookie_file: str, proxy: str | None = None):
@@ -48,12 +67,10 @@ class CookieClient(InstagramClient):
             raise AuthError(f"Could not parse cookie file: {e}") from e
 
     async def __aenter__(self):
-        connector = None
         if self.proxy:
-            connector = ProxyConnector.from_url(self.proxy)
             log.API.debug(f"Cookie session proxy set: {self.proxy}")
 
-        self.session = aiohttp.ClientSession(connector=connector, headers=self.headers, cookies=self.cookies)
+        self.session = io.create_session(self.proxy, CONNECTION_POOL_SIZE, headers=self.headers, cookies=self.cookies)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -62,37 +79,53 @@ class CookieClient(InstagramClient):
             self.session = None
 
     async def _get(self, url: str) -> dict:
-        log.API.debug(f"Cookie GET: {url}")
+        for attempt in range(1, RETRY_ATTEMPTS + 1):
+            await self.rate_limiter.acquire()
+            log.API.debug(f"Cookie GET: {url}")
+            try:
+                async with self.session.get(url, timeout=10) as resp:
+                    if resp.status not in RETRYABLE_STATUSES:
+                        return await self._read_json(resp, url)
+                    status = resp.status
+                    retry_after = resp.headers.get("Retry-After")
+            except (aiohttp.ClientError, TimeoutError) as e:
+                raise AuthError(f"Network error querying Instagram API: {e}") from e
+
+            if attempt < RETRY_ATTEMPTS:
+                delay = _retry_delay(attempt, retry_after)
+                log.API.warning(
+                    f"Instagram returned {status} for {url}, retrying in {delay:.1f}s ({attempt}/{RETRY_ATTEMPTS})..."
+                )
+                await asyncio.sleep(delay)
+
+        if status == 429:
+            raise InstagramError(f"Too many requests (429) for {url}")
+        raise InstagramError(f"Instagram returned {status} for {url} after {RETRY_ATTEMPTS} attempts")
+
+    async def _read_json(self, resp: aiohttp.ClientResponse, url: str) -> dict:
+        if resp.status in (401, 403):
+            raise AuthError(
+                f"Authentication failed (Status {resp.status}). Your cookies are likely expired or invalid."
+            )
+        if resp.status == 404:
+            raise UserNotFoundError(f"Instagram returned 404 for {url}")
+
+        content_type = resp.headers.get("Content-Type", "")
+        body = await resp.read()
+
+        if "json" not in content_type and ("text/html" in content_type or body.lstrip().startswith(b"<!DOCTYPE")):
+            log.API.debug(f"Raw response (status {resp.status}): {body[:500]!r}")
+            raise AuthError("Instagram redirected to the login page. Your cookies are invalid.")
+
         try:
-            async with self.session.get(url, timeout=10) as resp:
-                if resp.status in (401, 403):
-                    raise AuthError(
-                        f"Authentication failed (Status {resp.status}). Your cookies are likely expired or invalid."
-                    )
-                if resp.status == 404:
-                    raise UserNotFoundError(f"Instagram returned 404 for {url}")
-                if resp.status == 429:
-                    raise InstagramError(f"Too many requests (429) for {url}")
-
-                content_type = resp.headers.get("Content-Type", "")
-                text = await resp.text()
-
-                if "text/html" in content_type or text.lstrip().startswith("<!DOCTYPE"):
-                    log.API.debug(f"Raw response (status {resp.status}): {text[:500]!r}")
-                    raise AuthError("Instagram redirected to the login page. Your cookies are invalid.")
-
-                try:
-                    return await resp.json()
-                except (ValueError, aiohttp.ContentTypeError) as e:
-                    log.API.debug(f"Raw response (status {resp.status}): {text[:500]!r}")
-                    raise AuthError(f"Invalid API response (not JSON): {e}") from e
-
-        except (aiohttp.ClientError, TimeoutError) as e:
-            raise AuthError(f"Network error querying Instagram API: {e}") from e
+            return json.loads(body)
+        except ValueError as e:
+            log.API.debug(f"Raw response (status {resp.status}): {body[:500]!r}")
+            raise AuthError(f"Invalid API response (not JSON): {e}") from e
 
     async def fetch_user_id(self, username: str) -> str:
         username = username.lower()
-        user_data = await self._get(USER_API_URL.format(username=username))
+        user_data = await self._get(USER_API_URL.format(username=quote(username, safe="")))
         users = (item.get("user", {}) for item in user_data.get("users", []))
         user_id = next((u.get("pk") for u in users if u.get("username", "").lower() == username), None)
         if not user_id:
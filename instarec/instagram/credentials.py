@@ -1,5 +1,7 @@
 import asyncio
 import json
+from functools import lru_cache
+from pathlib import Path
 from typing import Any
 
 from instagrapi import Client
@@ -8,10 +10,9 @@ from instagrapi.exceptions import (
     LoginRequired,
     UserNotFound,
 )
-from platformdirs import user_config_path
 
 from .. import log
-from .client import InstagramClient
+from .client import CONFIG_DIR, InstagramClient
 from .exceptions import AuthError, UserNotFoundError
 
 USER_AGENT = (
@@ -19,13 +20,25 @@ USER_AGENT = (
 )
 
 
+@lru_cache(maxsize=4)
+def _read_credentials(path: Path, mtime_ns: int) -> tuple[str, str]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            creds = json.load(f)
+        return creds["username"], creds["password"]
+    except (json.JSONDecodeError, KeyError) as e:
+        log.API.critical(f"Error reading credentials file: {e}")
+        raise AuthError(f"Invalid credentials file: {e}") from e
+
+
 class CredentialsClient(InstagramClient):
+    config_dir = CONFIG_DIR
+    credentials_path = CONFIG_DIR / "credentials.json"
+    session_path = CONFIG_DIR / "session.json"
+
     def __init__(self, proxy: str | None = None):
         super().__init__(proxy)
         self._initialized = False
-        self.config_dir = user_config_path("instarec", "instarec")
-        self.credentials_path = self.config_dir / "credentials.json"
-        self.session_path = self.config_dir / "session.json"
 
         self.client = Client()
         self.client.set_user_agent(USER_AGENT)
@@ -59,13 +72,7 @@ class CredentialsClient(InstagramClient):
                 f"Credentials file not found at: {self.credentials_path}\n"
                 "Please create a 'credentials.json' file with 'username' and 'password'."
             )
-        try:
-            with self.credentials_path.open("r", encoding="utf-8") as f:
-                creds = json.load(f)
-            return creds["username"], creds["password"]
-        except (json.JSONDecodeError, KeyError) as e:
-            log.API.critical(f"Error reading credentials file: {e}")
-            raise AuthError(f"Invalid credentials file: {e}") from e
+        return _read_credentials(self.credentials_path, self.credentials_path.stat().st_mtime_ns)
 
     def _perform_login(self):
         username, password = self._load_credentials()
@@ -111,6 +118,7 @@ class CredentialsClient(InstagramClient):
             raise AuthError(f"Instagrapi error: {e}") from e
 
     async def fetch_user_id(self, username: str) -> str:
+        await self.rate_limiter.acquire()
         return await asyncio.to_thread(self._fetch_user_id_sync, username)
 
     def _fetch_user_id_sync(self, username: str) -> str:
@@ -125,6 +133,7 @@ class CredentialsClient(InstagramClient):
         return str(pk)
 
     async def fetch_live_info(self, user_id: str) -> dict[str, Any]:
+        await self.rate_limiter.acquire()
         return await asyncio.to_thread(
             self._private_request_with_retry,
             f"live/web_info/?target_user_id={user_id}",
@@ -133,6 +142,7 @@ class CredentialsClient(InstagramClient):
         )
 
     async def fetch_story_feed_info(self, user_id: str) -> dict[str, Any]:
+        await self.rate_limiter.acquire()
         return await asyncio.to_thread(
             self._private_request_with_retry,
             f"feed/user/{user_id}/story/",
@@ -9,8 +9,7 @@ from .utils import format_bandwidth
 
 def _display_representations(reps: list[etree._Element], media_type: str):
     print(f"\n--- Available {media_type.capitalize()} Streams ---")
-    sorted_reps = sorted(reps, key=lambda r: int(r.get("bandwidth", 0)), reverse=True)
-    for i, rep in enumerate(sorted_reps):
+    for i, rep in enumerate(reps):
         info = [f"[{i + 1}] ID: {rep.get('id', 'N/A')}"]
         if media_type == "video":
             res = f"{rep.get('width', '?')}x{rep.get('height', '?')}"
@@ -20,8 +19,7 @@ def _display_representations(reps: list[etree._Element], media_type: str):
         print(" | ".join(info))
 
 
-def _prompt_for_selection(reps: list[etree._Element], media_type: str) -> str:
-    sorted_reps = sorted(reps, key=lambda r: int(r.get("bandwidth", 0)), reverse=True)
+def _prompt_for_selection(sorted_reps: list[etree._Element], media_type: str) -> str:
     while True:
         try:
             choice = input(f"Select a {media_type} stream (enter number, press Enter for best): ")
@@ -43,18 +41,25 @@ def _prompt_for_selection(reps: list[etree._Element], media_type: str) -> str:
             sys.exit(0)
 
 
-async def interactive_stream_selection(mpd_url: str) -> dict[str, str | None]:
+async def interactive_stream_selection(mpd_url: str, session: aiohttp.ClientSession) -> dict[str, str | None]:
     print("Fetching stream information for interactive selection...")
     try:
-        async with aiohttp.ClientSession() as session:
-            root, _ = await mpd.fetch_and_parse_mpd(session, mpd_url, retries=5, retry_delay=1.0)
-            if root is None:
-                raise RuntimeError("Could not fetch or parse manifest from URL.")
+        root, _ = await mpd.fetch_and_parse_mpd(session, mpd_url, retries=5, retry_delay=1.0)
+        if root is None:
+            raise RuntimeError("Could not fetch or parse manifest from URL.")
     except aiohttp.ClientError as e:
         raise RuntimeError(f"Could not fetch manifest from URL. {e}") from e
 
-    video_reps = root.xpath('//mpd:Representation[@mimeType="video/mp4"]', namespaces=mpd.NS)
-    audio_reps = root.xpath('//mpd:Representation[@mimeType="audio/mp4"]', namespaces=mpd.NS)
+    video_reps: list[etree._Element] = []
+    audio_reps: list[etree._Element] = []
+    for rep in root.iter(mpd.REPRESENTATION_TAG):
+        mime_type = rep.get("mimeType")
+        if mime_type == "video/mp4":
+            video_reps.append(rep)
+        elif mime_type == "audio/mp4":
+            audio_reps.append(rep)
+    video_reps.sort(key=lambda r: int(r.get("bandwidth", 0)), reverse=True)
+    audio_reps.sort(key=lambda r: int(r.get("bandwidth", 0)), reverse=True)
 
     if not video_reps:
         raise RuntimeError("No video streams found in the manifest.")
@@ -1,31 +1,46 @@
 import asyncio
 import logging
+import os
 from pathlib import Path
 from typing import TYPE_CHECKING
-from urllib.parse import urljoin
 
-import aiofiles
 import aiohttp
 from aiohttp.client_reqrep import CIMultiDictProxy
+from aiohttp_socks import ProxyConnector
 
 if TYPE_CHECKING:
     from .downloader import StreamDownloader
 
 
+def create_session(proxy: str | None, pool_size: int, **session_options) -> aiohttp.ClientSession:
+    connector_options = {"limit": pool_size, "keepalive_timeout": 75, "ttl_dns_cache": 300}
+    if proxy:
+        connector = ProxyConnector.from_url(proxy, **connector_options)
+    else:
+        connector = aiohttp.TCPConnector(**connector_options)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=5, sock_read=10)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout, **session_options)
+
+
 async def fetch_url_content(
     session: aiohttp.ClientSession,
     url: str,
     retries: int,
     retry_delay: float,
-    log: logging.LoggerAdapter,
+    log: logging.Logger,
+    headers: dict[str, str] | None = None,
+    cached_content: bytes | None = None,
 ) -> tuple[bytes | None, CIMultiDictProxy | None]:
     delay = retry_delay
     for attempt in range(retries):
         try:
-            async with session.get(url, timeout=10) as response:
+            async with session.get(url, headers=headers, timeout=10) as response:
                 if response.status == 200:
                     return await response.read(), response.headers
 
+                if response.status == 304:
+                    return cached_content, response.headers
+
                 if response.status == 404:
                     log.warning(f"Segment not found at {url} (404 Not Found). Will not retry.")
                     return None, response.headers
@@ -45,45 +60,75 @@ async def fetch_url_content(
     return None, None
 
 
-async def download_file(downloader: "StreamDownloader", url: str, path: Path, log: logging.LoggerAdapter) -> bool:
+def _write_all(fd: int, content: bytes) -> None:
+    view = memoryview(content)
+    while view:
+        view = view[os.write(fd, view) :]
+
+
+async def write_file(path: Path, content: bytes) -> None:
+    await asyncio.to_thread(path.write_bytes, content)
+
+
+class SegmentWriter:
+    def __init__(self, video_path: Path, audio_path: Path):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0)
+        self._video_fd = os.open(video_path, flags, 0o644)
+        try:
+            self._audio_fd = os.open(audio_path, flags, 0o644)
+        except OSError:
+            os.close(self._video_fd)
+            raise
+        self._write: asyncio.Future[None] | None = None
+
+    def _write_pair(self, video_content: bytes, audio_content: bytes) -> None:
+        _write_all(self._video_fd, video_content)
+        _write_all(self._audio_fd, audio_content)
+
+    async def append(self, video_content: bytes, audio_content: bytes) -> None:
+        # Cancelling the caller cannot stop the worker thread, so the write is tracked until close() has waited for it.
+        self._write = asyncio.ensure_future(asyncio.to_thread(self._write_pair, video_content, audio_content))
+        await asyncio.shield(self._write)
+
+    async def close(self) -> None:
+        if self._write is not None:
+            await asyncio.gather(self._write, return_exceptions=True)
+        os.close(self._video_fd)
+        os.close(self._audio_fd)
+
+
+async def download_file(downloader: "StreamDownloader", url: str, path: Path, log: logging.Logger) -> bool:
     content, _ = await fetch_url_content(
         downloader.session, url, downloader.download_retries, downloader.download_retry_delay, log
     )
     if content:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        async with aiofiles.open(path, "wb") as f:
-            await f.write(content)
+        await write_file(path, content)
         return True
     return False
 
 
-async def download_and_append_segment(
-    downloader: "StreamDownloader",
-    timestamp: int,
-    video_path: Path,
-    audio_path: Path,
-    log: logging.LoggerAdapter,
-) -> bool:
-    video_url = urljoin(downloader.base_url, downloader.stream_info["video"]["media"].replace("$Time$", str(timestamp)))
-    audio_url = urljoin(downloader.base_url, downloader.stream_info["audio"]["media"].replace("$Time$", str(timestamp)))
-    results = await asyncio.gather(
-        fetch_url_content(
-            downloader.session, video_url, downloader.download_retries, downloader.download_retry_delay, log
-        ),
-        fetch_url_content(
-            downloader.session, audio_url, downloader.download_retries, downloader.download_retry_delay, log
-        ),
-    )
-
-    video_content, _ = results[0]
-    audio_content, _ = results[1]
+async def fetch_segment_pair(
+    downloader: "StreamDownloader", timestamp: int, log: logging.Logger
+) -> tuple[bytes, bytes] | None:
+    urls = (downloader.segment_url("video", timestamp), downloader.segment_url("audio", timestamp))
+    fetches = [
+        asyncio.create_task(
+            fetch_url_content(
+                downloader.session, url, downloader.download_retries, downloader.download_retry_delay, log
+            )
+        )
+        for url in urls
+    ]
+    try:
+        for next_fetch in asyncio.as_completed(fetches):
+            content, _ = await next_fetch
+            if not content:
+                log.warning(f"Failed to download one or both segments for t={timestamp}")
+                return None
+    finally:
+        for fetch in fetches:
+            fetch.cancel()
+        await asyncio.gather(*fetches, return_exceptions=True)
 
-    if video_content and audio_content:
-        log.debug(f"Downloaded segment pair for t={timestamp}")
-        async with aiofiles.open(video_path, "ab") as f_vid:
-            await f_vid.write(video_content)
-        async with aiofiles.open(audio_path, "ab") as f_aud:
-            await f_aud.write(audio_content)
-        return True
-    log.warning(f"Failed to download one or both segments for t={timestamp}")
-    return False
+    log.debug("Downloaded segment pair for t=%s", timestamp)
+    return fetches[0].result()[0], fetches[1].result()[0]
@@ -1,4 +1,5 @@
 import asyncio
+import random
 from typing import TYPE_CHECKING
 
 from . import io, log, mpd
@@ -7,41 +8,52 @@ from .progress_bar import ProgressBar
 if TYPE_CHECKING:
     from .downloader import StreamDownloader
 
+LIVE_DOWNLOAD_CONCURRENCY = 8
+POLL_BACKOFF_EMPTY_POLLS = 3
+MAX_POLL_BACKOFF_EXPONENT = 3
+
+
+def _backoff_poll_interval(downloader: "StreamDownloader", empty_polls: int) -> float:
+    # An occasional empty poll is just the poll landing between two segments; only sustained silence backs off.
+    if empty_polls < POLL_BACKOFF_EMPTY_POLLS:
+        return downloader.poll_interval
+    exponent = min(empty_polls - POLL_BACKOFF_EMPTY_POLLS + 1, MAX_POLL_BACKOFF_EXPONENT)
+    interval = downloader.poll_interval * 2**exponent * random.uniform(1.0, 1.5)
+    max_interval = downloader.poll_interval * 2**MAX_POLL_BACKOFF_EXPONENT
+    return min(interval, max_interval, max(downloader.poll_interval, downloader.live_end_timeout / 2))
+
 
 async def poll_live_manifest(downloader: "StreamDownloader"):
     log.LIVE_POLL.info("Starting live manifest poller.")
-    queued_live_timestamps: set[int] = set()
-    last_new_segment_time: float | None = None
+    last_queued_t = downloader.stream_info.initial_t - 1
+    last_new_segment_time = asyncio.get_running_loop().time()
+    manifest_cache = mpd.ManifestCache()
+    poll_interval = downloader.poll_interval
+    empty_polls = 0
 
     while True:
-        await asyncio.sleep(downloader.poll_interval)
+        await asyncio.sleep(poll_interval)
 
         root, is_ended = await mpd.fetch_and_parse_mpd(
-            downloader.session, downloader.mpd_url, downloader.download_retries, downloader.download_retry_delay
+            downloader.session,
+            downloader.mpd_url,
+            downloader.download_retries,
+            downloader.download_retry_delay,
+            manifest_cache,
         )
 
+        new_timestamps: list[int] = []
         if root is not None:
-            timeline = root.find(".//mpd:SegmentTimeline", namespaces=mpd.NS)
+            timeline = mpd.find_segment_timeline(root)
             if timeline is not None:
-                found_new_segment = False
-                for segment in timeline.findall("mpd:S", namespaces=mpd.NS):
+                for segment in timeline.iterchildren(mpd.S_TAG, reversed=True):
                     t = int(segment.get("t", 0))
-                    if t >= downloader.stream_info["initial_t"] and t not in queued_live_timestamps:
-                        found_new_segment = True
-                        queued_live_timestamps.add(t)
-                        await downloader.live_download_queue.put(t)
-
-                if found_new_segment:
-                    last_new_segment_time = asyncio.get_running_loop().time()
-                elif last_new_segment_time is not None:
-                    time_since_last_segment = asyncio.get_running_loop().time() - last_new_segment_time
-                    if time_since_last_segment > downloader.live_end_timeout:
-                        log.LIVE_POLL.info(
-                            f"No new segments for {time_since_last_segment:.2f}s. "
-                            "Assuming stream has ended. Shutting down live poller."
-                        )
-                        await downloader.live_download_queue.put(None)
+                    if t <= last_queued_t:
                         break
+                    new_timestamps.append(t)
+
+                for t in reversed(new_timestamps):
+                    await downloader.live_download_queue.put(t)
         elif not is_ended:
             log.LIVE_POLL.warning("Failed to fetch or parse live manifest, continuing...")
 
@@ -52,37 +64,77 @@ async def poll_live_manifest(downloader: "StreamDownloader"):
             await downloader.live_download_queue.put(None)
             break
 
+        # A failed poll counts as a poll without new segments, so a manifest that stops answering still times out.
+        if new_timestamps:
+            last_queued_t = new_timestamps[0]
+            last_new_segment_time = asyncio.get_running_loop().time()
+            poll_interval = downloader.poll_interval
+            empty_polls = 0
+            continue
+
+        empty_polls += 1
+        poll_interval = _backoff_poll_interval(downloader, empty_polls)
+        time_since_last_segment = asyncio.get_running_loop().time() - last_new_segment_time
+        if time_since_last_segment > downloader.live_end_timeout:
+            log.LIVE_POLL.info(
+                f"No new segments for {time_since_last_segment:.2f}s. "
+                "Assuming stream has ended. Shutting down live poller."
+            )
+            await downloader.live_download_queue.put(None)
+            break
+
+
+async def _dispatch_live_downloads(
+    downloader: "StreamDownloader", pending: "asyncio.Queue[tuple[int, asyncio.Task] | None]"
+):
+    while True:
+        timestamp = await downloader.live_download_queue.get()
+        downloader.live_download_queue.task_done()
+        if timestamp is None:
+            await pending.put(None)
+            return
+        task = asyncio.create_task(io.fetch_segment_pair(downloader, timestamp, log.LIVE_DL))
+        await pending.put((timestamp, task))
+
 
 async def process_live_downloads(downloader: "StreamDownloader"):
     log.LIVE_DL.info("Starting live segment downloader.")
 
-    downloader.video_live_path.touch()
-    downloader.audio_live_path.touch()
+    # Segments are fetched concurrently but handed over in queue order, so the .tmp files stay in timestamp order.
+    pending: asyncio.Queue[tuple[int, asyncio.Task] | None] = asyncio.Queue(
+        maxsize=min(downloader.max_search_requests, LIVE_DOWNLOAD_CONCURRENCY)
+    )
+    dispatcher = asyncio.create_task(_dispatch_live_downloads(downloader, pending))
 
+    writer = io.SegmentWriter(downloader.video_live_path, downloader.audio_live_path)
     progress_bar = ProgressBar("LIVE STREAM")
-    last_live_t = downloader.stream_info["initial_t"]
+    last_live_t = downloader.stream_info.initial_t
     try:
-        while True:
-            timestamp = await downloader.live_download_queue.get()
-            if timestamp is None:
-                log.LIVE_DL.info("Stop signal received, ending live downloads.")
-                downloader.live_download_queue.task_done()
-                break
+        while (item := await pending.get()) is not None:
+            timestamp, task = item
 
             progress_bar.update(timestamp - last_live_t)
             last_live_t = timestamp
 
             downloader.total_expected_segments += 1
-            was_successful = await io.download_and_append_segment(
-                downloader, timestamp, downloader.video_live_path, downloader.audio_live_path, log.LIVE_DL
-            )
-            if was_successful:
+            segments = await task
+            if segments is not None:
+                await writer.append(*segments)
                 if downloader.first_segment_t is None or timestamp < downloader.first_segment_t:
                     downloader.first_segment_t = timestamp
             else:
-                downloader.missing_segment_timestamps.add(timestamp)
+                downloader.missing_segment_timestamps.append(timestamp)
 
-            downloader.live_download_queue.task_done()
+        log.LIVE_DL.info("Stop signal received, ending live downloads.")
     finally:
+        dispatcher.cancel()
+        leftover_tasks = [dispatcher]
+        while not pending.empty():
+            if (item := pending.get_nowait()) is not None:
+                item[1].cancel()
+                leftover_tasks.append(item[1])
+        await asyncio.gather(*leftover_tasks, return_exceptions=True)
+
+        await writer.close()
         if progress_bar is not None:
             progress_bar.close()
@@ -1,19 +1,47 @@
 import logging
+import sys
 
 
-class _TaskLogger(logging.LoggerAdapter):
+class _TaskNameInjector(logging.Filter):
     def __init__(self, task_name: str):
-        super().__init__(logging.getLogger(), {"task_name": task_name})
-
-
-MAIN = _TaskLogger("MAIN")
-INIT = _TaskLogger("INIT")
-API = _TaskLogger("API")
-MPD = _TaskLogger("MPD")
-PAST = _TaskLogger("PAST")
-SEARCH = _TaskLogger("SEARCH")
-LIVE_POLL = _TaskLogger("LIVE-POLL")
-LIVE_DL = _TaskLogger("LIVE-DL")
-MERGE = _TaskLogger("MERGE")
-SUMMARY = _TaskLogger("SUMMARY")
-FFPROBE = _TaskLogger("FFPROBE")
+        super().__init__()
+        self.task_name = task_name
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.task_name = self.task_name
+        return True
+
+
+class DeferredLog(logging.LoggerAdapter):
+    def __init__(self, logger: logging.Logger):
+        super().__init__(logger, {})
+        self.records: list[tuple[int, object, tuple, dict]] = []
+
+    def log(self, level, msg, *args, **kwargs):
+        if kwargs.get("exc_info") is True:
+            kwargs["exc_info"] = sys.exc_info()
+        self.records.append((level, msg, args, kwargs))
+
+    def replay(self, level: int | None = None):
+        for record_level, msg, args, kwargs in self.records:
+            self.logger.log(record_level if level is None else level, msg, *args, **kwargs)
+        self.records.clear()
+
+
+def _task_logger(task_name: str) -> logging.Logger:
+    logger = logging.getLogger(f"instarec.{task_name}")
+    logger.addFilter(_TaskNameInjector(task_name))
+    return logger
+
+
+MAIN = _task_logger("MAIN")
+INIT = _task_logger("INIT")
+API = _task_logger("API")
+MPD = _task_logger("MPD")
+PAST = _task_logger("PAST")
+SEARCH = _task_logger("SEARCH")
+LIVE_POLL = _task_logger("LIVE-POLL")
+LIVE_DL = _task_logger("LIVE-DL")
+MERGE = _task_logger("MERGE")
+SUMMARY = _task_logger("SUMMARY")
+FFPROBE = _task_logger("FFPROBE")
@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -27,60 +28,100 @@ LABELS = {
 }
 
 
-def _write_summary(path, content):
+@dataclass(slots=True)
+class SummaryData:
+    file_name: str
+    file_size_bytes: int
+    duration_str: str
+    first_ts: str
+    total_expected: int
+    missing_segments: list[int]
+    segment_duration: int
+
+
+def _write_summary(path: Path, content: str):
+    try:
+        unchanged = path.read_text(encoding="utf-8") == content
+    except (OSError, UnicodeDecodeError):
+        unchanged = False
+    if unchanged:
+        log.SUMMARY.debug(f"Summary file unchanged, skipping write: {path}")
+        return
+
     try:
-        with Path.open(path, "w", encoding="utf-8") as f:
-            f.writelines(content)
+        path.write_text(content, encoding="utf-8")
     except OSError:
         log.SUMMARY.exception("Failed to write summary file")
 
 
-def _generate_summary_content(downloader: "StreamDownloader", lang: str) -> list[str]:
-    labels = LABELS.get(lang, LABELS["en"])
-    content = [f"* {downloader.output_path.name}\n"]
+def _format_missing_ranges(timestamps: list[int], step: int) -> str:
+    ranges = []
+    for t in timestamps:
+        if ranges and step > 0 and t - ranges[-1][1] == step:
+            ranges[-1][1] = t
+        else:
+            ranges.append([t, t])
+    return "[" + ", ".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges) + "]"
 
-    file_size_bytes = 0
-    if downloader.output_path.exists():
-        file_size_bytes = downloader.output_path.stat().st_size
-    content.append(f"- {labels['filesize']} : {file_size_bytes:,}/{file_size_bytes:,} (100.00%)\n")
 
+def _collect_summary_data(downloader: "StreamDownloader") -> SummaryData:
+    file_size_bytes = 0
     duration_str = "00:00:00"
-    duration_seconds = 0.0
-    if downloader.output_path.exists():
-        d = utils.get_video_duration(downloader.output_path, downloader.ffprobe_path)
-        if d:
-            duration_seconds = d
+    try:
+        stat = downloader.output_path.stat()
+    except FileNotFoundError:
+        stat = None
+    if stat is not None:
+        file_size_bytes = stat.st_size
+        duration_seconds = utils.get_video_duration(downloader.output_path, downloader.ffprobe_path, stat)
+        if duration_seconds:
             duration_str = utils.format_duration(duration_seconds)
-    content.append(f"- {labels['duration']} : {duration_str}\n")
 
-    if downloader.total_expected_segments == 0:
-        content.append("- Status           : No segments were downloaded.\n\n")
-        return content
+    return SummaryData(
+        file_name=downloader.output_path.name,
+        file_size_bytes=file_size_bytes,
+        duration_str=duration_str,
+        first_ts=str(downloader.first_segment_t) if downloader.first_segment_t is not None else "N/A",
+        total_expected=downloader.total_expected_segments,
+        missing_segments=sorted(downloader.missing_segment_timestamps),
+        segment_duration=downloader.stream_info.segment_duration if downloader.stream_info else 0,
+    )
 
-    first_ts = str(downloader.first_segment_t) if downloader.first_segment_t is not None else "N/A"
-    content.append(f"- {labels['first_ts']} : {first_ts}\n")
 
-    total_expected = downloader.total_expected_segments
-    missing_segments = sorted(downloader.missing_segment_timestamps)
-    miss_count = len(missing_segments)
-    loss_percent = (miss_count / total_expected * 100) if total_expected > 0 else 0
+def _generate_summary_content(data: SummaryData, lang: str) -> str:
+    labels = LABELS.get(lang, LABELS["en"])
+    content = [
+        f"* {data.file_name}\n",
+        f"- {labels['filesize']} : {data.file_size_bytes:,}/{data.file_size_bytes:,} (100.00%)\n",
+        f"- {labels['duration']} : {data.duration_str}\n",
+    ]
 
-    segment_range = f"0 ~ {total_expected - 1}" if total_expected > 0 else "0 ~ 0"
+    if data.total_expected == 0:
+        content.append("- Status           : No segments were downloaded.\n\n")
+        return "".join(content)
 
-    content.append(f"- {labels['segments']} : {segment_range} ({total_expected})\n")
-    content.append(f"- {labels['loss']}   : {miss_count}/{total_expected} ({loss_percent:.2f}%)\n")
-    content.append(f"- {labels['missing']}   : {missing_segments}\n\n")
+    content.append(f"- {labels['first_ts']} : {data.first_ts}\n")
+
+    total_expected = data.total_expected
+    miss_count = len(data.missing_segments)
+    loss_percent = miss_count / total_expected * 100
+    missing_ranges = _format_missing_ranges(data.missing_segments, data.segment_duration)
 
-    return content
+    content.append(f"- {labels['segments']} : 0 ~ {total_expected - 1} ({total_expected})\n")
+    content.append(f"- {labels['loss']}   : {miss_count}/{total_expected} ({loss_percent:.2f}%)\n")
+    content.append(f"- {labels['missing']}   : {missing_ranges}\n\n")
 
+    return "".join(content)
 
-def create_summary_file(downloader: "StreamDownloader"):
-    log.SUMMARY.info(f"Generating summary file at: {downloader.summary_file_path}")
-    content = _generate_summary_content(downloader, "en")
-    _write_summary(downloader.summary_file_path, content)
 
+def create_summary_files(downloader: "StreamDownloader"):
+    if not downloader.summary_file_path and not downloader.summary_file_korean_path:
+        return
 
-def create_korean_summary_file(downloader: "StreamDownloader"):
-    log.SUMMARY.info(f"Generating Korean summary file at: {downloader.summary_file_korean_path}")
-    content = _generate_summary_content(downloader, "ko")
-    _write_summary(downloader.summary_file_korean_path, content)
+    data = _collect_summary_data(downloader)
+    if downloader.summary_file_path:
+        log.SUMMARY.info(f"Generating summary file at: {downloader.summary_file_path}")
+        _write_summary(downloader.summary_file_path, _generate_summary_content(data, "en"))
+    if downloader.summary_file_korean_path:
+        log.SUMMARY.info(f"Generating Korean summary file at: {downloader.summary_file_korean_path}")
+        _write_summary(downloader.summary_file_korean_path, _generate_summary_content(data, "ko"))
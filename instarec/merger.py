@@ -1,5 +1,7 @@
+import asyncio
 import shutil
-import subprocess
+from collections import deque
+from pathlib import Path
 from typing import TYPE_CHECKING
 
 from . import log
@@ -7,65 +9,93 @@ from . import log
 if TYPE_CHECKING:
     from .downloader import StreamDownloader
 
+FFMPEG_STDERR_TAIL_LINES = 50
+
+
+def _join_parts(paths: list[Path], target: Path):
+    with target.open("wb") as joined:
+        for path in paths:
+            with path.open("rb") as part:
+                shutil.copyfileobj(part, joined)
+
+
+async def _concat_input(*paths: Path) -> str | None:
+    existing = [path for path in paths if path.exists() and path.stat().st_size > 0]
+    if not existing:
+        return None
+    if len(existing) == 1:
+        return str(existing[0])
+    if any("|" in str(path) for path in existing):
+        # The concat protocol splits on '|' without any escaping, so such paths are joined on disk instead.
+        target = existing[0].with_name(f"{existing[0].stem}_joined.tmp")
+        log.MERGE.debug(f"Segment path contains '|', joining parts into {target.name}")
+        await asyncio.to_thread(_join_parts, existing, target)
+        return str(target)
+    return "concat:" + "|".join(str(path) for path in existing)
+
+
+async def _drain_stderr(stream: asyncio.StreamReader) -> str:
+    tail: deque[str] = deque(maxlen=FFMPEG_STDERR_TAIL_LINES)
+    async for line in stream:
+        text = line.decode(errors="replace").rstrip()
+        log.MERGE.debug("ffmpeg: %s", text)
+        tail.append(text)
+    return "\n".join(tail)
 
-def finalize_video(downloader: "StreamDownloader"):
-    log.MERGE.debug("Starting final merge process...")
 
-    video_full_path = downloader.segments_dir / "video_full.mp4"
-    audio_full_path = downloader.segments_dir / "audio_full.mp4"
-
-    log.MERGE.info("Concatenating video files...")
-    with video_full_path.open("wb") as f_dest:
-        if downloader.video_past_path.exists():
-            with downloader.video_past_path.open("rb") as f_src:
-                shutil.copyfileobj(f_src, f_dest)
-        if downloader.video_live_path.exists():
-            with downloader.video_live_path.open("rb") as f_src:
-                shutil.copyfileobj(f_src, f_dest)
-
-    log.MERGE.info("Concatenating audio files...")
-    with audio_full_path.open("wb") as f_dest:
-        if downloader.audio_past_path.exists():
-            with downloader.audio_past_path.open("rb") as f_src:
-                shutil.copyfileobj(f_src, f_dest)
-        if downloader.audio_live_path.exists():
-            with downloader.audio_live_path.open("rb") as f_src:
-                shutil.copyfileobj(f_src, f_dest)
-
-    if not video_full_path.exists() or video_full_path.stat().st_size == 0:
-        log.MERGE.error("No video data was downloaded. Cannot create final file.")
-        return
+async def _run_ffmpeg(ffmpeg_command: list[str]) -> tuple[int, str]:
+    process = await asyncio.create_subprocess_exec(
+        *ffmpeg_command, stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        stderr, returncode = await asyncio.gather(_drain_stderr(process.stderr), process.wait())
+    except asyncio.CancelledError:
+        process.kill()
+        await process.wait()
+        raise
+    return returncode, stderr
+
+
+async def finalize_video(downloader: "StreamDownloader"):
+    log.MERGE.debug("Starting final merge process...")
 
     try:
+        video_input = await _concat_input(downloader.video_past_path, downloader.video_live_path)
+        audio_input = await _concat_input(downloader.audio_past_path, downloader.audio_live_path)
+
+        if video_input is None:
+            log.MERGE.error("No video data was downloaded. Cannot create final file.")
+            return
+
         ffmpeg_command = [
             downloader.ffmpeg_path,
             "-hide_banner",
             "-loglevel",
             "error",
             "-i",
-            str(video_full_path),
-            "-i",
-            str(audio_full_path),
-            "-c",
-            "copy",
+            video_input,
         ]
-        if downloader.output_path.suffix.lower() == ".mp4":
-            log.MERGE.info("Output is .mp4, adding '-movflags +faststart' for web compatibility.")
+        if audio_input is not None:
+            ffmpeg_command.extend(["-i", audio_input])
+        ffmpeg_command.extend(["-c", "copy"])
+        if downloader.faststart and downloader.output_path.suffix.lower() == ".mp4":
+            log.MERGE.info("Adding '-movflags +faststart' for web compatibility.")
             ffmpeg_command.extend(["-movflags", "+faststart"])
 
         ffmpeg_command.extend(["-y", str(downloader.output_path.resolve())])
 
         log.MERGE.debug(f"Executing FFmpeg muxing: {' '.join(ffmpeg_command)}")
-        subprocess.run(ffmpeg_command, check=True, capture_output=True)  # noqa: S603
+        returncode, stderr = await _run_ffmpeg(ffmpeg_command)
+        if returncode != 0:
+            log.MERGE.error(f"FFmpeg failed to merge files (exit code {returncode}). FFmpeg stderr:\n{stderr}\n")
+            return
         log.MERGE.info(f"Successfully merged video to {downloader.output_path}")
 
         if not downloader.keep_segments:
             log.MERGE.debug(f"Cleaning up temporary directory: {downloader.segments_dir}")
-            shutil.rmtree(downloader.segments_dir)
+            await asyncio.to_thread(shutil.rmtree, downloader.segments_dir)
         else:
             log.MERGE.debug(f"Keeping temporary directory: {downloader.segments_dir}")
 
-    except subprocess.CalledProcessError as e:
-        log.MERGE.exception(f"FFmpeg failed to merge files. FFmpeg stderr:\n{e.stderr.decode()}\n")
     except Exception:
         log.MERGE.exception("An unexpected error occurred during merge.")
@@ -1,11 +1,18 @@
-from typing import Any
+from dataclasses import dataclass
 
 import aiohttp
+from aiohttp.client_reqrep import CIMultiDictProxy
 from lxml import etree
 
 from . import io, log, utils
 
 NS = {"mpd": "urn:mpeg:dash:schema:mpd:2011"}
+S_TAG = f"{{{NS['mpd']}}}S"
+REPRESENTATION_TAG = f"{{{NS['mpd']}}}Representation"
+TIMELINE_XPATH = etree.XPath("(.//mpd:SegmentTimeline)[1]", namespaces=NS)
+LAST_SEGMENT_XPATH = etree.XPath(".//mpd:S[last()]", namespaces=NS)
+REPRESENTATIONS_XPATH = etree.XPath("//mpd:Representation[@mimeType=$mime_type]", namespaces=NS)
+MPD_PARSER = etree.XMLParser(collect_ids=False, resolve_entities=False, no_network=True)
 
 
 def _format_rep_info(rep: etree._Element, media_name: str) -> str:
@@ -24,12 +31,59 @@ def _format_rep_info(rep: etree._Element, media_name: str) -> str:
     return ", ".join(info_parts)
 
 
+@dataclass(slots=True)
+class MediaTemplate:
+    init: str
+    media: str
+    url_prefix: str = ""
+    url_suffix: str = ""
+
+
+@dataclass(slots=True)
+class StreamInfo:
+    video: MediaTemplate
+    audio: MediaTemplate
+    publish_frame_time: int | None
+    initial_t: int
+    segment_duration: int
+
+
+class ManifestCache:
+    def __init__(self):
+        self.root: etree._Element | None = None
+        self.content: bytes | None = None
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+
+    def request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def update(self, root: etree._Element, content: bytes, headers: CIMultiDictProxy):
+        self.root = root
+        self.content = content
+        # A 304 is not required to repeat the validators, so the previous ones are kept when it omits them.
+        self.etag = headers.get("ETag", self.etag)
+        self.last_modified = headers.get("Last-Modified", self.last_modified)
+
+
 async def fetch_and_parse_mpd(
-    session: aiohttp.ClientSession, mpd_url: str, retries: int, retry_delay: float
+    session: aiohttp.ClientSession,
+    mpd_url: str,
+    retries: int,
+    retry_delay: float,
+    cache: ManifestCache | None = None,
 ) -> tuple[etree._Element | None, bool]:
     is_ended = False
     try:
-        xml_content, headers = await io.fetch_url_content(session, mpd_url, retries, retry_delay, log.MPD)
+        request_headers = cache.request_headers() if cache and cache.root is not None else None
+        xml_content, headers = await io.fetch_url_content(
+            session, mpd_url, retries, retry_delay, log.MPD, request_headers, cache.content if cache else None
+        )
 
         if headers and "x-fb-video-broadcast-ended" in headers:
             is_ended = True
@@ -37,16 +91,29 @@ async def fetch_and_parse_mpd(
         if not xml_content:
             return None, is_ended
 
-        return etree.fromstring(xml_content), is_ended
+        if cache and cache.root is not None and xml_content == cache.content:
+            log.MPD.debug("Manifest unchanged since last poll.")
+            cache.update(cache.root, xml_content, headers)
+            return cache.root, is_ended
+
+        root = etree.fromstring(xml_content, MPD_PARSER)
+        if cache:
+            cache.update(root, xml_content, headers)
+        return root, is_ended
 
     except (etree.XMLSyntaxError, Exception):
         log.MPD.exception("Failed to parse MPD XML. This may happen normally at the end of a stream.")
         return None, is_ended
 
 
+def find_segment_timeline(root: etree._Element) -> etree._Element | None:
+    timelines = TIMELINE_XPATH(root)
+    return timelines[0] if timelines else None
+
+
 def parse_initial_stream_info(
     root: etree._Element, preferred_video_ids: list[str] | None, preferred_audio_ids: list[str] | None
-) -> dict[str, Any]:
+) -> StreamInfo:
     video_rep = select_representation(root, "video/mp4", preferred_video_ids)
     audio_rep = select_representation(root, "audio/mp4", preferred_audio_ids)
 
@@ -56,34 +123,33 @@ def parse_initial_stream_info(
     publish_frame_time_str = root.get("publishFrameTime")
     publish_frame_time = int(publish_frame_time_str) if publish_frame_time_str else None
 
-    last_segment = video_template.find(".//mpd:S[last()]", namespaces=NS)
-    if last_segment is None:
+    last_segments = LAST_SEGMENT_XPATH(video_template)
+    if not last_segments:
         raise ValueError("Could not find any segments in the MPD.")
+    last_segment = last_segments[-1]
 
-    return {
-        "video": {"init": video_template.get("initialization"), "media": video_template.get("media")},
-        "audio": {"init": audio_template.get("initialization"), "media": audio_template.get("media")},
-        "publish_frame_time": publish_frame_time,
-        "initial_t": int(last_segment.get("t", 0)),
-    }
+    return StreamInfo(
+        video=MediaTemplate(video_template.get("initialization"), video_template.get("media")),
+        audio=MediaTemplate(audio_template.get("initialization"), audio_template.get("media")),
+        publish_frame_time=publish_frame_time,
+        initial_t=int(last_segment.get("t", 0)),
+        segment_duration=int(last_segment.get("d", 0)),
+    )
 
 
 def select_representation(root: etree._Element, media_type: str, preferred_ids: list[str] | None) -> etree._Element:
-    media_name = media_type.split("/")[0]  # "video" or "audio"
+    media_name = media_type.split("/", maxsplit=1)[0]  # "video" or "audio"
 
-    xpath_query = f'//mpd:Representation[@mimeType="{media_type}"]'
-    all_reps = root.xpath(xpath_query, namespaces=NS)
+    all_reps = REPRESENTATIONS_XPATH(root, mime_type=media_type)
     if not all_reps:
         raise ValueError(f"No representations found for mimeType '{media_type}'")
 
     if preferred_ids:
+        reps_by_id = {rep.get("id"): rep for rep in reversed(all_reps)}
         for rep_id in preferred_ids:
-            for rep in all_reps:
-                if rep.get("id") == rep_id:
-                    log.INIT.info(
-                        f"Found user-specified {media_name} representation: {_format_rep_info(rep, media_name)}"
-                    )
-                    return rep
+            if (rep := reps_by_id.get(rep_id)) is not None:
+                log.INIT.info(f"Found user-specified {media_name} representation: {_format_rep_info(rep, media_name)}")
+                return rep
         log.INIT.warning(
             f"None of the preferred {media_name} IDs found: {preferred_ids}. Falling back to highest bitrate."
         )
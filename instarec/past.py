@@ -1,67 +1,71 @@
 import asyncio
-from typing import TYPE_CHECKING
-from urllib.parse import urljoin
+import itertools
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Coroutine, Iterator
+from contextlib import aclosing
+from typing import TYPE_CHECKING, Any
 
 import aiohttp
 
 from . import io, log
 from .progress_bar import ProgressBar
-from .utils import get_next_pts_from_concatenated_file
+from .utils import fmp4_segment_end_time, get_next_pts_from_concatenated_file
 
 if TYPE_CHECKING:
     from .downloader import StreamDownloader
 
+PAST_PREFETCH_DEPTH = 4
+PROBE_TIMEOUT = aiohttp.ClientTimeout(total=3)
 
-async def check_url_exists(
-    downloader: "StreamDownloader", url: str, timestamp: int, semaphore: asyncio.Semaphore
-) -> int | None:
-    async with semaphore:
-        for attempt in range(downloader.check_url_retries):
-            try:
-                async with downloader.session.head(url, timeout=3) as response:
-                    if response.status == 200:
-                        return timestamp
-                    if 400 <= response.status < 500 and response.status != 429:
-                        return None
-            except (TimeoutError, aiohttp.ClientError, RuntimeError, asyncio.CancelledError):
-                if attempt == downloader.check_url_retries - 1:
+
+async def check_url_exists(downloader: "StreamDownloader", url: str, timestamp: int) -> int | None:
+    for attempt in range(downloader.check_url_retries):
+        try:
+            async with downloader.session.head(url, timeout=PROBE_TIMEOUT) as response:
+                if response.status == 200:
+                    return timestamp
+                if 400 <= response.status < 500 and response.status != 429:
                     return None
-                await asyncio.sleep(0.5)
+        except (TimeoutError, aiohttp.ClientError, RuntimeError):
+            if attempt == downloader.check_url_retries - 1:
+                return None
+            await asyncio.sleep(0.5)
     return None
 
 
-async def search_forwards_for_next_segment(downloader: "StreamDownloader", start_t: int) -> int | None:
-    log.SEARCH.info(f"Searching for next segment from t={start_t}...")
-    semaphore = asyncio.Semaphore(downloader.max_search_requests)
-    media_template = downloader.stream_info["video"]["media"]
-
-    all_tasks = []
+async def bounded_as_completed(
+    coros: Iterator[Coroutine[Any, Any, int | None]], limit: int
+) -> AsyncIterator[int | None]:
+    pending: set[asyncio.Task[int | None]] = {asyncio.create_task(coro) for coro in itertools.islice(coros, limit)}
     try:
-        for i in range(0, downloader.end_stream_miss_threshold, downloader.search_chunk_size):
-            chunk_start = start_t + i
-            chunk_end = chunk_start + downloader.search_chunk_size
-            log.SEARCH.debug(f"Searching in range t=[{chunk_start}, {chunk_end})...")
-
-            chunk_tasks = [
-                asyncio.create_task(
-                    check_url_exists(
-                        downloader, urljoin(downloader.base_url, media_template.replace("$Time$", str(t))), t, semaphore
-                    )
-                )
-                for t in range(chunk_start, chunk_end)
-            ]
-            all_tasks.extend(chunk_tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if (coro := next(coros, None)) is not None:
+                    pending.add(asyncio.create_task(coro))
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
 
-            for future in asyncio.as_completed(chunk_tasks):
-                result = await future
+async def search_forwards_for_next_segment(downloader: "StreamDownloader", start_t: int) -> int | None:
+    log.SEARCH.info(f"Searching for next segment from t={start_t}...")
+    for i in range(0, downloader.end_stream_miss_threshold, downloader.search_chunk_size):
+        chunk_start = start_t + i
+        chunk_end = chunk_start + downloader.search_chunk_size
+        log.SEARCH.debug(f"Searching in range t=[{chunk_start}, {chunk_end})...")
+
+        chunk_coros = (
+            check_url_exists(downloader, downloader.segment_url("video", t), t) for t in range(chunk_start, chunk_end)
+        )
+        async with aclosing(bounded_as_completed(chunk_coros, downloader.max_search_requests)) as results:
+            async for result in results:
                 if result is not None:
                     log.SEARCH.info(f"Found first available segment at t={result}.")
                     return result
-    finally:
-        log.SEARCH.debug(f"Cleaning up {len(all_tasks)} search tasks.")
-        for task in all_tasks:
-            task.cancel()
-        await asyncio.gather(*all_tasks, return_exceptions=True)
 
     log.SEARCH.warning(
         f"Could not find any segment after searching {downloader.end_stream_miss_threshold} timestamps from {start_t}."
@@ -69,10 +73,86 @@ async def search_forwards_for_next_segment(downloader: "StreamDownloader", start
     return None
 
 
+async def probe_expected_segment(downloader: "StreamDownloader", after_t: int) -> int | None:
+    segment_duration = downloader.stream_info.segment_duration
+    if segment_duration <= 0:
+        return None
+
+    expected_t = after_t + segment_duration
+    log.SEARCH.debug("Probing expected segment boundary after t=%s: t=%s", after_t, expected_t)
+    return await check_url_exists(downloader, downloader.segment_url("video", expected_t), expected_t)
+
+
+async def find_next_segment(downloader: "StreamDownloader", after_t: int) -> int | None:
+    # Only the immediate boundary is trusted. Probing further ahead could skip a shorter segment in between.
+    next_t = await probe_expected_segment(downloader, after_t)
+    if next_t is not None:
+        log.SEARCH.info(f"Found segment at expected boundary t={next_t}.")
+        return next_t
+    return await search_forwards_for_next_segment(downloader, after_t + 1)
+
+
+class _SegmentPrefetcher:
+    def __init__(self, downloader: "StreamDownloader"):
+        self.downloader = downloader
+        self.pending: deque[tuple[int, asyncio.Task[tuple[bytes, bytes] | None], log.DeferredLog]] = deque()
+        self.next_start_time = 0.0
+        self.last_start_time = 0.0
+
+    def _start(
+        self, timestamp: int, fetch_log: logging.Logger | logging.LoggerAdapter
+    ) -> "asyncio.Task[tuple[bytes, bytes] | None]":
+        start_time = max(asyncio.get_running_loop().time(), self.next_start_time)
+        self.next_start_time = start_time + self.downloader.past_segment_delay
+        return asyncio.create_task(self._fetch_at(timestamp, start_time, fetch_log))
+
+    async def _fetch_at(self, timestamp: int, start_time: float, fetch_log: logging.Logger | logging.LoggerAdapter):
+        wait_time = start_time - asyncio.get_running_loop().time()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        self.last_start_time = start_time
+        return await io.fetch_segment_pair(self.downloader, timestamp, fetch_log)
+
+    def schedule(self, after_t: int, step: int):
+        next_t = self.pending[-1][0] if self.pending else after_t
+        while len(self.pending) < PAST_PREFETCH_DEPTH:
+            next_t += step
+            if next_t >= self.downloader.stream_info.initial_t:
+                break
+            # Speculative fetches hold their log output until it is known whether the segment is actually used.
+            deferred_log = log.DeferredLog(log.PAST)
+            self.pending.append((next_t, self._start(next_t, deferred_log), deferred_log))
+
+    async def take(self, timestamp: int) -> tuple[bytes, bytes] | None:
+        while self.pending and self.pending[0][0] < timestamp:
+            _, task, deferred_log = self.pending.popleft()
+            task.cancel()
+            deferred_log.replay(logging.DEBUG)
+        if self.pending and self.pending[0][0] == timestamp:
+            _, task, deferred_log = self.pending.popleft()
+            try:
+                return await task
+            finally:
+                deferred_log.replay()
+        self.cancel()
+        return await self._start(timestamp, log.PAST)
+
+    def cancel(self) -> list[asyncio.Task]:
+        cancelled = []
+        for _, task, deferred_log in self.pending:
+            task.cancel()
+            deferred_log.replay(logging.DEBUG)
+            cancelled.append(task)
+        self.pending.clear()
+        # Fetches that never got to start should not keep holding their pacing slots.
+        self.next_start_time = min(self.next_start_time, self.last_start_time + self.downloader.past_segment_delay)
+        return cancelled
+
+
 async def download_past_segments(downloader: "StreamDownloader"):
     log.PAST.info("Starting past segment downloader.")
 
-    publish_frame_time = downloader.stream_info.get("publish_frame_time")
+    publish_frame_time = downloader.stream_info.publish_frame_time
     if publish_frame_time is not None:
         log.PAST.debug(f"MPD has publishFrameTime={publish_frame_time}. Starting from here.")
         current_t = publish_frame_time
@@ -84,43 +164,51 @@ async def download_past_segments(downloader: "StreamDownloader"):
         log.PAST.error("Could not find any past segments. Aborting past download task.")
         return
 
-    progress_bar = ProgressBar("PAST STREAM", total=downloader.stream_info["initial_t"] - current_t)
+    # Segment lengths are nearly constant, so the next few timestamps are fetched speculatively while the current
+    # one is written and its end time confirmed. Every fetch start, speculative or not, honours past_segment_delay.
+    prefetcher = _SegmentPrefetcher(downloader)
+    step = downloader.stream_info.segment_duration
+    writer = io.SegmentWriter(downloader.video_past_path, downloader.audio_past_path)
+    progress_bar = ProgressBar("PAST STREAM", total=downloader.stream_info.initial_t - current_t)
     try:
-        while current_t is not None and current_t < downloader.stream_info["initial_t"]:
-            loop_start_time = asyncio.get_running_loop().time()
+        while current_t is not None and current_t < downloader.stream_info.initial_t:
             downloader.total_expected_segments += 1
 
-            was_successful = await io.download_and_append_segment(
-                downloader, current_t, downloader.video_past_path, downloader.audio_past_path, log.PAST
-            )
-            if was_successful:
+            segments = await prefetcher.take(current_t)
+            if segments is not None:
+                await writer.append(*segments)
                 if downloader.first_segment_t is None or current_t < downloader.first_segment_t:
                     downloader.first_segment_t = current_t
 
-                next_t = get_next_pts_from_concatenated_file(downloader.video_past_path, downloader.ffprobe_path)
+                if step > 0:
+                    prefetcher.schedule(current_t, step)
+
+                next_t = fmp4_segment_end_time(segments[0])
+                if next_t is None:
+                    next_t = await get_next_pts_from_concatenated_file(
+                        downloader.video_past_path, downloader.ffprobe_path
+                    )
                 if next_t is not None:
                     progress_bar.update(next_t - current_t)
+                    step = next_t - current_t
                     current_t = next_t
                 else:
                     log.PAST.warning(f"Could not get next PTS after t={current_t}. Searching for next segment...")
                     old_t = current_t
-                    current_t = await search_forwards_for_next_segment(downloader, current_t + 1)
+                    current_t = await find_next_segment(downloader, current_t)
                     if current_t:
                         progress_bar.update(current_t - old_t)
             else:
-                downloader.missing_segment_timestamps.add(current_t)
+                downloader.missing_segment_timestamps.append(current_t)
                 log.PAST.warning(f"Segment at t={current_t} missing. Searching for next available...")
                 old_t = current_t
-                current_t = await search_forwards_for_next_segment(downloader, current_t + 1)
+                current_t = await find_next_segment(downloader, current_t)
                 if current_t:
                     progress_bar.update(current_t - old_t)
-
-            if downloader.past_segment_delay > 0:
-                elapsed_time = asyncio.get_running_loop().time() - loop_start_time
-                wait_time = downloader.past_segment_delay - elapsed_time
-                if wait_time > 0:
-                    await asyncio.sleep(wait_time)
     finally:
+        await asyncio.gather(*prefetcher.cancel(), return_exceptions=True)
+
+        await writer.close()
         if progress_bar is not None:
             progress_bar.close()
 
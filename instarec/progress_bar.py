@@ -1,7 +1,9 @@
-from datetime import datetime
+import time
 
 from tqdm.asyncio import tqdm
 
+DESCRIPTION_REFRESH_INTERVAL = 1.0
+
 
 class ProgressBar:
     def __init__(self, stream_name: str, total: int | None = None):
@@ -11,16 +13,25 @@ class ProgressBar:
             if total is not None
             else "{desc}: [{elapsed}, {rate_fmt}] {n_fmt} {bar}"
         )
-        self._pbar = tqdm(total=total, unit="ts", bar_format=bar_format, dynamic_ncols=True)
-        self._update_description()
+        self._pbar = tqdm(
+            total=total, unit="ts", bar_format=bar_format, dynamic_ncols=True, mininterval=0.5, disable=None
+        )
+        self._last_description_time = 0.0
+        if not self._pbar.disable:
+            self._update_description()
 
     def _update_description(self):
-        time_now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S,%f")[:-3]
+        self._last_description_time = time.monotonic()
+        now = time.time()
+        time_now_str = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))},{int(now * 1000) % 1000:03d}"
         desc = f"{time_now_str} - INFO - [{self.stream_name}]"
         self._pbar.set_description(desc, refresh=False)
 
     def update(self, amount: int):
-        self._update_description()
+        if self._pbar.disable:
+            return
+        if time.monotonic() - self._last_description_time >= DESCRIPTION_REFRESH_INTERVAL:
+            self._update_description()
         self._pbar.update(amount)
 
     def set_total(self, new_total: int):
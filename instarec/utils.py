@@ -1,5 +1,8 @@
-import logging
+import asyncio
+import os
+import struct
 import subprocess
+from collections.abc import Iterator
 from pathlib import Path
 from time import gmtime, strftime
 
@@ -26,30 +29,120 @@ def format_duration(seconds: float) -> str:
     return strftime("%H:%M:%S", gmtime(seconds))
 
 
-def get_next_pts_from_concatenated_file(file_path: Path, ffprobe_path: str) -> int | None:
-    if not file_path.exists() or file_path.stat().st_size == 0:
+def _iter_boxes(data: bytes, start: int, end: int) -> Iterator[tuple[bytes, int, int]]:
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            return
+        yield box_type, offset + header_size, offset + size
+        offset += size
+
+
+def _tfhd_default_sample_duration(data: bytes, start: int) -> int | None:
+    flags = struct.unpack_from(">I", data, start)[0] & 0xFFFFFF
+    offset = start + 8
+    if flags & 0x1:
+        offset += 8
+    if flags & 0x2:
+        offset += 4
+    return struct.unpack_from(">I", data, offset)[0] if flags & 0x8 else None
+
+
+def _tfdt_base_media_decode_time(data: bytes, start: int) -> int:
+    version = data[start]
+    return struct.unpack_from(">Q" if version == 1 else ">I", data, start + 4)[0]
+
+
+def _trun_duration(data: bytes, start: int, end: int, default_sample_duration: int | None) -> int | None:
+    flags = struct.unpack_from(">I", data, start)[0] & 0xFFFFFF
+    sample_count = struct.unpack_from(">I", data, start + 4)[0]
+    if not flags & 0x100:
+        return None if default_sample_duration is None else sample_count * default_sample_duration
+
+    offset = start + 8 + 4 * bool(flags & 0x1) + 4 * bool(flags & 0x4)
+    stride = 4 * bin(flags & 0xF00).count("1")
+    if offset + sample_count * stride > end:
         return None
+    return sum(struct.unpack_from(">I", data, offset + i * stride)[0] for i in range(sample_count))
+
+
+def fmp4_segment_end_time(segment: bytes) -> int | None:
+    end_time = None
     try:
-        command = [
-            ffprobe_path,
-            "-v",
-            "error",
-            "-show_entries",
-            "stream=duration_ts",
-            "-of",
-            "default=nw=1:nk=1",
-            str(file_path),
-        ]
-        result = subprocess.run(command, check=True, capture_output=True, text=True)  # noqa: S603
-        return int(result.stdout.strip())
-    except (subprocess.CalledProcessError, ValueError):
-        log.FFPROBE.exception(f"ffprobe failed for {file_path.name}.")
+        for box_type, moof_start, moof_end in _iter_boxes(segment, 0, len(segment)):
+            if box_type != b"moof":
+                continue
+            traf = next(
+                ((start, end) for kind, start, end in _iter_boxes(segment, moof_start, moof_end) if kind == b"traf"),
+                None,
+            )
+            if traf is None:
+                return None
+
+            decode_time = default_sample_duration = None
+            duration = 0
+            for kind, start, end in _iter_boxes(segment, *traf):
+                if kind == b"tfhd":
+                    default_sample_duration = _tfhd_default_sample_duration(segment, start)
+                elif kind == b"tfdt":
+                    decode_time = _tfdt_base_media_decode_time(segment, start)
+                elif kind == b"trun":
+                    trun_duration = _trun_duration(segment, start, end, default_sample_duration)
+                    if trun_duration is None:
+                        return None
+                    duration += trun_duration
+            if decode_time is None:
+                return None
+            end_time = max(end_time or 0, decode_time + duration)
+    except (struct.error, IndexError):
+        return None
+    return end_time
+
+
+def _is_missing_or_empty(file_path: Path) -> bool:
+    return not file_path.exists() or file_path.stat().st_size == 0
+
+
+async def get_next_pts_from_concatenated_file(file_path: Path, ffprobe_path: str) -> int | None:
+    if await asyncio.to_thread(_is_missing_or_empty, file_path):
+        return None
+    process = await asyncio.create_subprocess_exec(
+        ffprobe_path,
+        "-v",
+        "error",
+        "-show_entries",
+        "stream=duration_ts",
+        "-of",
+        "default=nw=1:nk=1",
+        str(file_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        log.FFPROBE.error(f"ffprobe failed for {file_path.name}: {stderr.decode(errors='replace').strip()}")
+        return None
+    try:
+        return int(stdout.strip())
+    except ValueError:
+        log.FFPROBE.exception(f"ffprobe returned no duration for {file_path.name}.")
         return None
 
 
-def get_video_duration(file_path: Path, ffprobe_path: str) -> float | None:
-    log = logging.LoggerAdapter(logging.getLogger(), {"task_name": "FFPROBE"})
-    if not file_path.exists() or file_path.stat().st_size == 0:
+def get_video_duration(file_path: Path, ffprobe_path: str, stat: os.stat_result | None = None) -> float | None:
+    if stat is None:
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            return None
+    if stat.st_size == 0:
         return None
     try:
         command = [
@@ -62,7 +155,7 @@ def get_video_duration(file_path: Path, ffprobe_path: str) -> float | None:
             "default=noprint_wrappers=1:nokey=1",
             str(file_path),
         ]
-        result = subprocess.run(command, check=True, capture_output=True, text=True)  # noqa: S603
+        result = subprocess.run(command, check=True, capture_output=True)  # noqa: S603
         return float(result.stdout.strip())
     except (subprocess.CalledProcessError, ValueError):
         log.FFPROBE.exception(f"ffprobe failed to get duration for {file_path.name}.")
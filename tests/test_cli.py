@@ -1,5 +1,7 @@
 import subprocess
 
+from instarec.cli import has_file_extension
+
 
 def test_cli_help_command():
     result = subprocess.run(["instarec", "--help"], capture_output=True, text=True)
@@ -12,3 +14,11 @@ def test_cli_version_command():
     assert result.returncode == 0
     assert "instarec" in result.stdout
     assert "unknown" not in result.stdout
+
+
+def test_has_file_extension():
+    assert has_file_extension("video.mkv")
+    assert has_file_extension("out/video.mp4")
+    assert not has_file_extension("video")
+    assert not has_file_extension("out.dir/video")
+    assert not has_file_extension(".hidden")
@@ -0,0 +1,47 @@
+import asyncio
+
+from instarec.instagram import InstagramClient, UserNotFoundError
+from instarec.instagram import client as client_module
+
+LIVE_USER_IDS = [str(user_id) for user_id in range(100, 110)]
+
+
+class StubClient(InstagramClient):
+    def __init__(self):
+        super().__init__()
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fetch_user_id(self, username: str) -> str:
+        raise AssertionError("numeric identifiers should not be resolved")
+
+    async def fetch_live_info(self, user_id: str) -> dict:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+        finally:
+            self.in_flight -= 1
+        if user_id in LIVE_USER_IDS:
+            return {"dash_abr_playback_url": f"https://example.com/{user_id}.mpd"}
+        raise UserNotFoundError(f"{user_id} has no live broadcast")
+
+    async def fetch_story_feed_info(self, user_id: str) -> dict:
+        if user_id == "404":
+            raise UserNotFoundError(f"{user_id} does not exist")
+        return {}
+
+
+def test_get_mpds_maps_each_identifier(monkeypatch, tmp_path):
+    monkeypatch.setattr(client_module, "USER_ID_CACHE_PATH", tmp_path / "user_ids.json")
+    monkeypatch.setattr(client_module, "MAX_CONCURRENT_LOOKUPS", 3)
+    client = StubClient()
+
+    mpd_urls = asyncio.run(client.get_mpds([*LIVE_USER_IDS, "200", "404"]))
+
+    assert mpd_urls == {
+        **{user_id: f"https://example.com/{user_id}.mpd" for user_id in LIVE_USER_IDS},
+        "200": None,
+        "404": None,
+    }
+    assert client.max_in_flight == 3
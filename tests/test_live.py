@@ -0,0 +1,16 @@
+from types import SimpleNamespace
+
+from instarec import live
+
+
+def test_poll_backoff_stays_within_bounds(monkeypatch):
+    monkeypatch.setattr(live.random, "uniform", lambda a, b: b)
+    downloader = SimpleNamespace(poll_interval=2.0, live_end_timeout=180.0)
+
+    intervals = [live._backoff_poll_interval(downloader, empty_polls) for empty_polls in range(1, 20)]
+
+    assert intervals[: live.POLL_BACKOFF_EMPTY_POLLS - 1] == [2.0] * (live.POLL_BACKOFF_EMPTY_POLLS - 1)
+    assert max(intervals) == 2.0 * 2**live.MAX_POLL_BACKOFF_EXPONENT
+
+    downloader.live_end_timeout = 10.0
+    assert live._backoff_poll_interval(downloader, 19) == 5.0
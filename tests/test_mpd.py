@@ -0,0 +1,43 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from instarec import io, mpd
+
+MANIFEST = b"""<?xml version="1.0"?>
+<MPD xmlns="urn:mpeg:dash:schema:mpd:2011">
+  <Period><AdaptationSet><Representation id="v" mimeType="video/mp4" bandwidth="1">
+    <SegmentTemplate initialization="init.m4v" media="$Time$.m4v">
+      <SegmentTimeline><S t="1000" d="2000"/><S t="3000" d="2000"/></SegmentTimeline>
+    </SegmentTemplate>
+  </Representation></AdaptationSet></Period>
+</MPD>"""
+
+
+def test_not_modified_without_validators_reuses_cached_manifest():
+    requests = []
+
+    async def handler(request: web.Request) -> web.Response:
+        requests.append(dict(request.headers))
+        if len(requests) == 1:
+            return web.Response(body=MANIFEST, headers={"Last-Modified": "Mon, 12 Oct 2026 10:00:00 GMT"})
+        return web.Response(status=304)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/x.mpd", handler)
+        async with TestServer(app) as server, io.create_session(None, 4) as session:
+            url = str(server.make_url("/x.mpd"))
+            cache = mpd.ManifestCache()
+            first, _ = await mpd.fetch_and_parse_mpd(session, url, 1, 0, cache)
+            second, _ = await mpd.fetch_and_parse_mpd(session, url, 1, 0, cache)
+            third, _ = await mpd.fetch_and_parse_mpd(session, url, 1, 0, cache)
+            return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert first is not None
+    assert second is first
+    assert third is first
+    assert requests[2]["If-Modified-Since"] == "Mon, 12 Oct 2026 10:00:00 GMT"
@@ -0,0 +1,91 @@
+import struct
+
+from instarec.utils import fmp4_segment_end_time
+
+
+def box(box_type: bytes, *children: bytes) -> bytes:
+    payload = b"".join(children)
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def full_box(box_type: bytes, version: int, flags: int, payload: bytes) -> bytes:
+    return box(box_type, struct.pack(">I", (version << 24) | flags), payload)
+
+
+def tfhd(default_sample_duration: int | None = None, base_data_offset: bool = False) -> bytes:
+    flags = 0
+    payload = struct.pack(">I", 1)
+    if base_data_offset:
+        flags |= 0x1
+        payload += struct.pack(">Q", 0)
+    if default_sample_duration is not None:
+        flags |= 0x8
+        payload += struct.pack(">I", default_sample_duration)
+    return full_box(b"tfhd", 0, flags, payload)
+
+
+def tfdt(decode_time: int, version: int = 1) -> bytes:
+    return full_box(b"tfdt", version, 0, struct.pack(">Q" if version == 1 else ">I", decode_time))
+
+
+def trun(
+    sample_count: int,
+    durations: list[int] | None = None,
+    data_offset: bool = False,
+    first_sample_flags: bool = False,
+    sample_sizes: bool = False,
+) -> bytes:
+    flags = 0
+    payload = struct.pack(">I", sample_count)
+    if data_offset:
+        flags |= 0x1
+        payload += struct.pack(">i", 0)
+    if first_sample_flags:
+        flags |= 0x4
+        payload += struct.pack(">I", 0)
+    if durations is not None:
+        flags |= 0x100
+    if sample_sizes:
+        flags |= 0x200
+    for i in range(sample_count):
+        if durations is not None:
+            payload += struct.pack(">I", durations[i])
+        if sample_sizes:
+            payload += struct.pack(">I", 1000)
+    return full_box(b"trun", 0, flags, payload)
+
+
+def segment(*traf_children: bytes) -> bytes:
+    return box(b"moof", full_box(b"mfhd", 0, 0, struct.pack(">I", 1)), box(b"traf", *traf_children)) + box(
+        b"mdat", b"\x00" * 16
+    )
+
+
+def test_fmp4_end_time_from_tfhd_default_duration():
+    assert fmp4_segment_end_time(segment(tfhd(default_sample_duration=512), tfdt(10_000), trun(4))) == 12_048
+
+
+def test_fmp4_end_time_from_trun_sample_durations():
+    data = segment(tfhd(base_data_offset=True), tfdt(10_000), trun(3, durations=[100, 200, 300]))
+    assert fmp4_segment_end_time(data) == 10_600
+
+
+def test_fmp4_end_time_skips_optional_trun_fields():
+    data = segment(
+        tfhd(default_sample_duration=999),
+        tfdt(5_000),
+        trun(2, durations=[1_000, 1_001], data_offset=True, first_sample_flags=True, sample_sizes=True),
+    )
+    assert fmp4_segment_end_time(data) == 7_001
+
+
+def test_fmp4_end_time_reads_32_bit_tfdt():
+    assert fmp4_segment_end_time(segment(tfhd(default_sample_duration=10), tfdt(2_000, version=0), trun(5))) == 2_050
+
+
+def test_fmp4_end_time_rejects_incomplete_segments():
+    data = segment(tfhd(), tfdt(10_000), trun(3, durations=[100, 200, 300]))
+    assert fmp4_segment_end_time(data[:60]) is None
+    assert fmp4_segment_end_time(segment(tfhd(), tfdt(10_000), trun(3))) is None
+    assert fmp4_segment_end_time(segment(tfhd(default_sample_duration=10), trun(3))) is None
+    assert fmp4_segment_end_time(b"") is None